@@ -2,9 +2,33 @@ import json
 import os
 import time
 import gzip
-from typing import List, Dict, Set
+import mmap
+import argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Iterator, List, Dict, Tuple
 import logging
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ijson
+    try:
+        # Prefer the C (YAJL) backend when it is available
+        ijson = ijson.get_backend('yajl2_c')
+    except ImportError:
+        pass
+except ImportError:
+    ijson = None
+
+try:
+    import zstandard as zstd
+except ImportError:
+    zstd = None
+
 # Set up logging
 logging.basicConfig(
     level=logging.INFO,
@@ -12,98 +36,246 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-def flatten_geocities_data(input_dir: str, output_file: str, chunk_size: int = 10000):
-    """Flatten all hood JSON files into compressed chunks optimized for random selection"""
-    all_pages = []
-    hood_names = set()
+def _load_json_file(path: str):
+    """Parse a JSON file, memory-mapping it for orjson when available"""
+    with open(path, 'rb') as f:
+        if orjson is None:
+            return json.load(f)
+        # orjson parses straight from the mapped pages, avoiding a copy into bytes
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+            return orjson.loads(view)
+
+def _json_dumps(obj) -> bytes:
+    """Serialize an object to compact JSON bytes, using orjson when available"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+# Fast compression levels; output is served through a CDN that can re-compress
+GZIP_LEVEL = 3
+ZSTD_LEVEL = 3
+# Write buffer size for compressed output files
+WRITE_BUFFER_SIZE = 1 << 20
+
+def _write_compressed(path: str, data: bytes, legacy_gzip: bool = False):
+    """Write bytes to a zstd-compressed file, or gzip-compressed in legacy mode"""
+    with open(path, 'wb', buffering=WRITE_BUFFER_SIZE) as raw:
+        if legacy_gzip:
+            with gzip.GzipFile(fileobj=raw, mode='wb', compresslevel=GZIP_LEVEL) as f:
+                f.write(data)
+            return
+        # One-shot compress so the frame header records the content size,
+        # which clients need for single-call decompression
+        cctx = zstd.ZstdCompressor(level=ZSTD_LEVEL, threads=-1)
+        raw.write(cctx.compress(data))
+
+# Hood files larger than this are streamed with ijson instead of loaded whole
+STREAM_THRESHOLD = 32 * 1024 * 1024
+
+def _iter_json_items(input_path: str, prefix: str) -> Iterator[Dict]:
+    """Stream the items under `prefix` from a JSON file without loading it whole"""
+    with open(input_path, 'rb') as f:
+        yield from ijson.items(f, prefix)
+
+# Field order of each page record in the chunks
+PAGE_FIELDS = ['title', 'url', 'last_modified', 'has_sound', 'source', 'hood', 'burb']
+
+def _flatten_one(input_path: str, hood_idx: int) -> Tuple[List[str], List[List]]:
+    """Parse a single hood JSON file and return its burb names and flattened page records"""
+    logger.info(f"Processing {input_path}")
+    burb_names = []
+    pages = []
+    # Share one string object per distinct date so records reference it
+    # instead of each holding a copy (pickle also memoizes shared objects)
+    dates = {}
     
-    # Read all JSON files from the input directory
-    for filename in os.listdir(input_dir):
-        if not filename.endswith('.json'):
-            continue
+    try:
+        if ijson is not None and os.path.getsize(input_path) > STREAM_THRESHOLD:
+            hood_cards = _iter_json_items(input_path, 'cards.item')
+            hood_burbs = _iter_json_items(input_path, 'burbs.item')
+        else:
+            hood_data = _load_json_file(input_path)
+            hood_cards = hood_data['cards']
+            hood_burbs = hood_data['burbs']
             
-        hood_name = filename[:-5]  # Remove .json extension
-        hood_names.add(hood_name)
-        
-        input_path = os.path.join(input_dir, filename)
-        logger.info(f"Processing {input_path}")
-        
-        try:
-            with open(input_path, 'r', encoding='utf-8') as f:
-                hood_data = json.load(f)
-                
-            # Add hood pages with minimal data
-            for card in hood_data['cards']:
-                all_pages.append({
-                    'title': card['title'],
-                    'url': card['url'],
-                    'has_sound': card.get('has_sound', False),
-                    'last_modified': card.get('last_modified'),
-                    'source': {
-                        't': 'h',  # shortened 'type': 'hood'
-                        'h': hood_name  # shortened 'hood_name'
-                    }
-                })
+        # Add hood pages as compact records (source 0 = hood, no burb)
+        for card in hood_cards:
+            last_modified = card.get('last_modified')
+            pages.append([
+                card['title'],
+                card['url'],
+                dates.setdefault(last_modified, last_modified),
+                int(card.get('has_sound', False)),
+                0,
+                hood_idx,
+                -1
+            ])
+            
+        # Add burb pages as compact records (source 1 = burb), indexing into
+        # this hood's burb name table
+        for burb in hood_burbs:
+            burb_idx = len(burb_names)
+            burb_names.append(burb['name'])
+            for card in burb['cards']:
+                last_modified = card.get('last_modified')
+                pages.append([
+                    card['title'],
+                    card['url'],
+                    dates.setdefault(last_modified, last_modified),
+                    int(card.get('has_sound', False)),
+                    1,
+                    hood_idx,
+                    burb_idx
+                ])
                 
-            # Add burb pages with minimal data
-            for burb in hood_data['burbs']:
-                for card in burb['cards']:
-                    all_pages.append({
-                        'title': card['title'],
-                        'url': card['url'],
-                        'has_sound': card.get('has_sound', False),
-                        'last_modified': card.get('last_modified'),
-                        'source': {
-                            't': 'b',  # shortened 'type': 'burb'
-                            'h': hood_name,  # shortened 'hood_name'
-                            'b': burb['name']  # shortened 'burb_name'
-                        }
-                    })
-                    
-        except Exception as e:
-            logger.error(f"Error processing {filename}: {str(e)}")
-            continue
+    except Exception as e:
+        logger.error(f"Error processing {os.path.basename(input_path)}: {str(e)}")
+        
+    return burb_names, pages
+
+def iter_pages(input_dir: str, hoods: List[str], burbs: List[List[str]]) -> Iterator[List]:
+    """Yield flattened page records one hood file at a time.
     
-    # Calculate number of chunks
-    total_chunks = (len(all_pages) + chunk_size - 1) // chunk_size
+    `hoods` and `burbs` are filled with the string tables that the records'
+    hood and burb indexes point into.
+    """
+    # Collect all JSON files from the input directory
+    with os.scandir(input_dir) as it:
+        entries = sorted(
+            (entry for entry in it if entry.is_file() and entry.name.endswith('.json')),
+            key=lambda entry: entry.name
+        )
+    paths = []
+    for entry in entries:
+        hoods.append(entry.name[:-5])  # Remove .json extension
+        paths.append(entry.path)
     
-    # Create metadata
-    metadata = {
-        'total_pages': len(all_pages),
-        'total_hoods': len(hood_names),
-        'hoods': sorted(list(hood_names)),
-        'generated_at': time.strftime('%Y-%m-%d %H:%M:%S'),
-        'chunks': total_chunks
+    # Parse hood files in parallel, yielding results in input order. Only a
+    # bounded number of files are in flight so parsed pages can't pile up
+    # when writing chunks is slower than parsing.
+    max_workers = os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=max_workers) as ex:
+        pending = deque()
+        next_idx = 0
+        while pending or next_idx < len(paths):
+            while next_idx < len(paths) and len(pending) < 2 * max_workers:
+                pending.append(ex.submit(_flatten_one, paths[next_idx], next_idx))
+                next_idx += 1
+            burb_names, pages = pending.popleft().result()
+            burbs.append(burb_names)
+            yield from pages
+
+def _legacy_page(record: List, hoods: List[str], burbs: List[List[str]]) -> Dict:
+    """Rebuild the dict page layout read by the legacy (gzip) client from a record"""
+    title, url, last_modified, has_sound, source, hood_idx, burb_idx = record
+    if source == 0:
+        page_source = {
+            't': 'h',  # shortened 'type': 'hood'
+            'h': hoods[hood_idx]  # shortened 'hood_name'
+        }
+    else:
+        page_source = {
+            't': 'b',  # shortened 'type': 'burb'
+            'h': hoods[hood_idx],  # shortened 'hood_name'
+            'b': burbs[hood_idx][burb_idx]  # shortened 'burb_name'
+        }
+    return {
+        'title': title,
+        'url': url,
+        'has_sound': bool(has_sound),
+        'last_modified': last_modified,
+        'source': page_source
     }
+
+def _write_chunk(base_name: str, chunk: List[List], chunk_idx: int, ext: str,
+                 hoods: List[str], burbs: List[List[str]], legacy_gzip: bool = False):
+    """Compress and write a single chunk of pages.
+    
+    Chunks are JSON Lines (one record per line); legacy gzip chunks keep the
+    single JSON array of dict pages that the current client reads.
+    """
+    if legacy_gzip:
+        chunk_file = f"{base_name}_chunk_{chunk_idx}.json{ext}"
+        data = _json_dumps([_legacy_page(record, hoods, burbs) for record in chunk])
+    else:
+        chunk_file = f"{base_name}_chunk_{chunk_idx}.jsonl{ext}"
+        data = b'\n'.join(_json_dumps(page) for page in chunk) + b'\n'
+    _write_compressed(chunk_file, data, legacy_gzip)
+    logger.info(f"Saved chunk {chunk_idx + 1} to {chunk_file}")
+
+def flatten_geocities_data(input_dir: str, output_file: str, chunk_size: int = 10000,
+                           legacy_gzip: bool = False):
+    """Flatten all hood JSON files into compressed chunks optimized for random selection"""
+    if not legacy_gzip and zstd is None:
+        raise ImportError("zstandard is required for zstd output; use --legacy-gzip to write gzip chunks")
+    
+    # Compressed file extension
+    ext = '.gz' if legacy_gzip else '.zst'
     
     # Create output directory if it doesn't exist
     output_dir = os.path.dirname(output_file)
     if output_dir:
         os.makedirs(output_dir, exist_ok=True)
     
-    # Save metadata
-    metadata_file = output_file.replace('.json', '_metadata.json.gz')
-    with gzip.open(metadata_file, 'wt', encoding='utf-8') as f:
-        json.dump(metadata, f)
-    logger.info(f"Saved metadata to {metadata_file}")
-    
-    # Save data in chunks
+    # Stream pages into chunks, writing each one as soon as it is full.
+    # zstd already compresses with multiple threads, so chunks are written one
+    # at a time; gzip chunks are compressed and written on a thread pool.
+    max_workers = (os.cpu_count() or 1) if legacy_gzip else 1
     base_name = os.path.splitext(output_file)[0]
-    for i in range(total_chunks):
-        start_idx = i * chunk_size
-        end_idx = min((i + 1) * chunk_size, len(all_pages))
-        chunk = all_pages[start_idx:end_idx]
+    hoods = []
+    burbs = []
+    buf = []
+    chunk_idx = 0
+    pending = deque()
+    with ThreadPoolExecutor(max_workers=max_workers) as ex:
+        for page in iter_pages(input_dir, hoods, burbs):
+            buf.append(page)
+            if len(buf) == chunk_size:
+                pending.append(ex.submit(_write_chunk, base_name, buf, chunk_idx, ext, hoods, burbs, legacy_gzip))
+                chunk_idx += 1
+                buf = []
+                # Bound the number of chunks held in memory while writing
+                if len(pending) > max_workers:
+                    pending.popleft().result()
         
-        chunk_file = f"{base_name}_chunk_{i}.json.gz"
-        with gzip.open(chunk_file, 'wt', encoding='utf-8') as f:
-            json.dump(chunk, f)
-        logger.info(f"Saved chunk {i + 1}/{total_chunks} to {chunk_file}")
+        total_pages = chunk_idx * chunk_size + len(buf)
+        
+        # Write the remaining partial chunk
+        if buf:
+            pending.append(ex.submit(_write_chunk, base_name, buf, chunk_idx, ext, hoods, burbs, legacy_gzip))
+            chunk_idx += 1
+        for future in pending:
+            future.result()
+    total_chunks = chunk_idx
+    
+    # Create metadata
+    metadata = {
+        'total_pages': total_pages,
+        'total_hoods': len(hoods),
+        'hoods': hoods,
+        'generated_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'chunks': total_chunks
+    }
+    if not legacy_gzip:
+        # String tables and field order for the array records
+        metadata['burbs'] = burbs
+        metadata['fields'] = PAGE_FIELDS
+    
+    # Save metadata
+    metadata_file = output_file.replace('.json', f'_metadata.json{ext}')
+    _write_compressed(metadata_file, _json_dumps(metadata), legacy_gzip)
+    logger.info(f"Saved metadata to {metadata_file}")
     
     logger.info(f"Data saved in {total_chunks} compressed chunks")
-    logger.info(f"Total pages: {len(all_pages)}")
-    logger.info(f"Total hoods: {len(hood_names)}")
+    logger.info(f"Total pages: {total_pages}")
+    logger.info(f"Total hoods: {len(hoods)}")
 
 def main():
+    parser = argparse.ArgumentParser(description='Geocities Data Flattener')
+    parser.add_argument('--legacy-gzip', action='store_true', help='Write gzip chunks in the legacy JSON array format (for the current client)')
+    
+    args = parser.parse_args()
+    
     input_dir = 'geocities_data'
     output_file = 'geocities_flattened.json'
     
@@ -111,7 +283,7 @@ def main():
         logger.error(f"Input directory {input_dir} does not exist")
         return
         
-    flatten_geocities_data(input_dir, output_file)
+    flatten_geocities_data(input_dir, output_file, legacy_gzip=args.legacy_gzip)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
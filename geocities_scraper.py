@@ -1,13 +1,49 @@
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from bs4 import BeautifulSoup, SoupStrainer
+import soupsieve
 import json
 from urllib.parse import urljoin
 import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import argparse
-from typing import List, Dict, Optional, Set
+from typing import Iterator, List, Dict, Optional, Set, Tuple
 import logging
 import os
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    from requests_cache import CachedSession
+except ImportError:
+    CachedSession = None
+
+try:
+    from selectolax.parser import HTMLParser
+except ImportError:
+    HTMLParser = None
+
+try:
+    import lxml
+    BS4_PARSER = 'lxml'
+except ImportError:
+    BS4_PARSER = 'html.parser'
+
+# Only build the card subtrees when parsing with BeautifulSoup. The strainer
+# sees the raw class attribute, so match 'card' as one of its classes.
+ONLY_CARDS = SoupStrainer('div', class_=lambda value: value is not None and 'card' in value.split())
+# Card field selectors, compiled once for the BeautifulSoup fallback
+TITLE_SELECTOR = soupsieve.compile('div.card-title a')
+SUBTITLE_SELECTOR = soupsieve.compile('div.card-subtitle')
+
+# Speaker icon (🔊) marking pages that play sound
+SOUND_ICON = '\U0001f50a'
+
 # Set up logging
 logging.basicConfig(
     level=logging.INFO,
@@ -15,59 +51,126 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+class RateLimiter:
+    def __init__(self, rate: float):
+        """Allow at most `rate` calls per second, shared across threads"""
+        if not rate > 0:
+            raise ValueError(f"Rate must be positive, got {rate}")
+        self.interval = 1.0 / rate
+        self._lock = threading.Lock()
+        self._next_time = 0.0
+
+    def wait(self):
+        """Block until the next call slot is available"""
+        with self._lock:
+            now = time.monotonic()
+            delay = self._next_time - now
+            self._next_time = max(now, self._next_time) + self.interval
+        if delay > 0:
+            time.sleep(delay)
+
 class GeocitiesScraper:
-    def __init__(self, config_path: str):
+    def __init__(self, config_path: str, max_workers: int = 8, rate_limit: float = 1.0,
+                 use_cache: bool = True):
         """Initialize the scraper with configuration"""
         self.config = self._load_config(config_path)
         self.base_url = self.config['base_url']
         self.output_dir = 'geocities_data'
+        self.max_workers = max_workers
+        self.rate_limiter = RateLimiter(rate_limit)
+        # Share one pooled session across all worker threads, caching
+        # responses on disk so reruns skip unchanged pages
+        if use_cache and CachedSession is not None:
+            self.session = CachedSession(
+                'geocities_http_cache',
+                backend='sqlite',
+                expire_after=86400 * 7,
+                stale_if_error=True
+            )
+        else:
+            self.session = requests.Session()
+        # Retry transient failures with exponential backoff instead of losing the page
+        retry = Retry(
+            total=5,
+            backoff_factor=0.5,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=('GET',)
+        )
+        adapter = HTTPAdapter(max_retries=retry, pool_connections=32, pool_maxsize=32)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
         # Create output directory if it doesn't exist
         os.makedirs(self.output_dir, exist_ok=True)
         
     def _load_config(self, config_path: str) -> Dict:
         """Load configuration from JSON file"""
         try:
-            with open(config_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            with open(config_path, 'rb') as f:
+                data = f.read()
+            if orjson is not None:
+                return orjson.loads(data)
+            return json.loads(data)
         except Exception as e:
             logger.error(f"Error loading config: {str(e)}")
             raise
 
+    def _iter_card_fields(self, html: str) -> Iterator[Tuple[str, Optional[str]]]:
+        """Yield the title and subtitle text of each card on a page"""
+        if HTMLParser is not None:
+            tree = HTMLParser(html)
+            for card in tree.css('div.card'):
+                title_element = card.css_first('div.card-title a')
+                title = title_element.text() if title_element else "Untitled"
+                subtitle_element = card.css_first('div.card-subtitle')
+                yield title, subtitle_element.text() if subtitle_element else None
+            return
+        
+        # Fall back to BeautifulSoup when selectolax is not installed
+        soup = BeautifulSoup(html, BS4_PARSER, parse_only=ONLY_CARDS)
+        for card in soup.find_all('div', class_='card', recursive=False):
+            title_element = TITLE_SELECTOR.select_one(card)
+            title = title_element.text if title_element else "Untitled"
+            subtitle_element = SUBTITLE_SELECTOR.select_one(card)
+            yield title, subtitle_element.get_text() if subtitle_element else None
+
+    def _get_cached_response(self, url: str):
+        """Return a fresh cached response for a URL, or None if it must be fetched"""
+        cache = getattr(self.session, 'cache', None)
+        if cache is None:
+            return None
+        response = cache.get_response(cache.create_key(requests.Request('GET', url)))
+        if response is None or response.is_expired:
+            return None
+        return response
+
     def get_burb_cards(self, url: str) -> List[Dict]:
         """Scrape individual cards from a page (neighborhood or burb)"""
         try:
-            response = requests.get(url)
+            # Serve fresh cache hits directly; only real requests are rate limited
+            response = self._get_cached_response(url)
+            if response is None:
+                self.rate_limiter.wait()  # Be nice to the server
+                response = self.session.get(url, timeout=(5, 30))
             response.raise_for_status()
             
-            soup = BeautifulSoup(response.text, 'html.parser')
             cards = []
             
-            # Find all card elements
-            card_elements = soup.find_all('div', class_='card')
-            
-            for card in card_elements:
+            for title, subtitle_text in self._iter_card_fields(response.text):
                 try:
-                    # Get the card title
-                    title_element = card.find('div', class_='card-title')
-                    title = title_element.find('a').text if title_element and title_element.find('a') else "Untitled"
-                    
                     # Get the URL and last modified date from the subtitle
-                    subtitle_element = card.find('div', class_='card-subtitle')
-                    if subtitle_element:
-                        subtitle_text = subtitle_element.get_text()
+                    if subtitle_text is not None:
                         # Split the subtitle text into URL and last modified
-                        parts = subtitle_text.split('Last modified:')
-                        url = parts[0].strip() if len(parts) > 0 else ""
+                        left, sep, right = subtitle_text.partition('Last modified:')
                         # Remove 'www.geocities.com/' prefix from URL
-                        url = url.replace('www.geocities.com/', '')
-                        last_modified = parts[1].strip() if len(parts) > 1 else ""
+                        page_url = left.strip().removeprefix('www.geocities.com/')
+                        last_modified = right.strip() if sep else ""
                         
                         # Check for sound icon in the title
-                        has_sound = '🔊' in title
+                        has_sound = SOUND_ICON in title
                         
                         cards.append({
                             'title': title,
-                            'url': url,
+                            'url': page_url,
                             'last_modified': last_modified,
                             'has_sound': has_sound
                         })
@@ -106,18 +209,22 @@ class GeocitiesScraper:
             'base_url': self.base_url
         }
         
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(hood_data, f, indent=2, ensure_ascii=False)
+        if orjson is not None:
+            data = orjson.dumps(hood_data, option=orjson.OPT_INDENT_2)
+        else:
+            data = json.dumps(hood_data, indent=2, ensure_ascii=False).encode('utf-8')
+        with open(output_file, 'wb') as f:
+            f.write(data)
         logger.info(f"Saved hood data to {output_file}")
 
     def get_scraped_hoods(self) -> Set[str]:
         """Get list of already scraped hoods"""
-        scraped_hoods = set()
-        for filename in os.listdir(self.output_dir):
-            if filename.endswith('.json'):
-                hood_name = filename[:-5]  # Remove .json extension
-                scraped_hoods.add(hood_name)
-        return scraped_hoods
+        with os.scandir(self.output_dir) as it:
+            return set(
+                entry.name[:-5]  # Remove .json extension
+                for entry in it
+                if entry.is_file() and entry.name.endswith('.json')
+            )
 
     def scrape_hood(self, hood_name: str, burbs: Optional[List[str]] = None) -> Dict:
         """Scrape a specific neighborhood and its burbs"""
@@ -127,22 +234,25 @@ class GeocitiesScraper:
         hood_info = self.config['neighborhoods'][hood_name]
         hood_url = f"{self.base_url}/{hood_name}"
         
-        # First scrape the neighborhood page itself
-        logger.info(f"Scraping neighborhood page: {hood_url}")
-        hood_cards = self.get_burb_cards(hood_url)
-        
         # If no burbs specified, use all from config
         burbs_to_scrape = burbs or hood_info['burbs']
         
-        scraped_burbs = []
+        valid_burbs = []
         for burb_name in burbs_to_scrape:
             if burb_name in hood_info['burbs']:
-                burb_data = self.scrape_burb(hood_name, burb_name)
-                scraped_burbs.append(burb_data)
-                time.sleep(1)  # Be nice to the server
+                valid_burbs.append(burb_name)
             else:
                 logger.warning(f"Burb {burb_name} not found in hood {hood_name}")
         
+        # Scrape the neighborhood page and its burbs concurrently;
+        # the shared rate limiter keeps requests polite
+        with ThreadPoolExecutor(max_workers=self.max_workers) as ex:
+            logger.info(f"Scraping neighborhood page: {hood_url}")
+            hood_future = ex.submit(self.get_burb_cards, hood_url)
+            futures = [ex.submit(self.scrape_burb, hood_name, burb_name) for burb_name in valid_burbs]
+            hood_cards = hood_future.result()
+            scraped_burbs = [future.result() for future in futures]
+        
         hood_data = {
             'name': hood_name,
             'description': hood_info['description'],
@@ -158,16 +268,38 @@ class GeocitiesScraper:
         
         return hood_data
 
+def positive_int(value: str) -> int:
+    """Argparse type for integers greater than zero"""
+    number = int(value)
+    if number <= 0:
+        raise argparse.ArgumentTypeError(f"must be a positive integer, got {value}")
+    return number
+
+def positive_float(value: str) -> float:
+    """Argparse type for numbers greater than zero"""
+    number = float(value)
+    if not number > 0:
+        raise argparse.ArgumentTypeError(f"must be a positive number, got {value}")
+    return number
+
 def main():
     parser = argparse.ArgumentParser(description='Geocities Archive Scraper')
     parser.add_argument('--config', default='geocities_config.json', help='Path to config file')
     parser.add_argument('--hood', help='Specific neighborhood to scrape')
     parser.add_argument('--burbs', nargs='*', help='Specific burbs to scrape (optional)')
     parser.add_argument('--resume', action='store_true', help='Resume scraping from where it left off')
+    parser.add_argument('--workers', type=positive_int, default=8, help='Number of burbs to scrape concurrently')
+    parser.add_argument('--rate-limit', type=positive_float, default=1.0, help='Maximum requests per second')
+    parser.add_argument('--no-cache', action='store_true', help='Disable the on-disk HTTP response cache')
     
     args = parser.parse_args()
     
-    scraper = GeocitiesScraper(args.config)
+    scraper = GeocitiesScraper(
+        args.config,
+        max_workers=args.workers,
+        rate_limit=args.rate_limit,
+        use_cache=not args.no_cache
+    )
     
     try:
         if args.hood:
@@ -11,18 +11,18 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Any run of whitespace (including newlines and tabs)
+_WS_MULTI = re.compile(r'\s+')
+
 class GeocitiesConfigScraper:
     def __init__(self):
         self.base_url = "https://geocities.restorativland.org"
         
     def clean_text(self, text: str) -> str:
         """Clean text by removing escape characters and extra whitespace"""
-        # Replace newlines and tabs with spaces
-        text = re.sub(r'[\n\t]+', ' ', text)
-        # Remove multiple spaces
-        text = re.sub(r'\s+', ' ', text)
-        # Strip leading/trailing whitespace
-        return text.strip()
+        # Collapse newlines, tabs and repeated spaces into single spaces,
+        # then strip leading/trailing whitespace
+        return _WS_MULTI.sub(' ', text).strip()
         
     def scrape_main_page(self):
         """Scrape the main page to get all neighborhoods and their details"""